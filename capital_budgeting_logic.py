@@ -1,31 +1,44 @@
+import math
 import numpy as np
 import numpy_financial as npf
-from typing import List, Dict, Union, Optional, Tuple
+from functools import lru_cache
+from typing import List, Dict, Union, Optional, Set, Tuple
+
+# pyxirr (Rust) is an optional, faster fallback IRR solver
+try:
+    import pyxirr
+    _HAS_PYXIRR = True
+except ImportError:
+    _HAS_PYXIRR = False
 
 
 def calculate_all_metrics(
         rate: float,
         initial_investment_positive: float,
-        future_cash_flows: List[float],
+        future_cash_flows: Union[List[float], np.ndarray],
         reinvestment_rate: Optional[float] = None,
-        finance_rate: Optional[float] = None
-) -> Dict[str, Union[float, str]]:
+        finance_rate: Optional[float] = None,
+        metrics: Optional[Set[str]] = None
+) -> Dict[str, Union[float, str, List[float]]]:
     """
     Calculates all key capital budgeting metrics.
 
     Args:
         rate: The discount rate (e.g., 0.1 for 10%).
         initial_investment_positive: The initial cost, as a positive number.
-        future_cash_flows: A list of cash flows for years 1, 2, ...
+        future_cash_flows: A list or array of cash flows for years 1, 2, ...
         reinvestment_rate: Rate for reinvesting positive cash flows (for MIRR). Defaults to 'rate'.
         finance_rate: Rate for financing negative cash flows (for MIRR). Defaults to 'rate'.
+        metrics: Result keys to compute (e.g., {'npv', 'irr'}). Defaults to all metrics.
+            NPV is always included since the other metrics build on it.
 
     Returns:
-        A dictionary containing all calculated metrics.
+        A dictionary containing the calculated metrics, plus the per-year
+        'discounted_cash_flows' so callers can reuse them without re-discounting.
     """
 
     # --- Input Validation ---
-    if not future_cash_flows:
+    if len(future_cash_flows) == 0:
         raise ValueError("No future cash flows provided.")
     if initial_investment_positive <= 0:
         raise ValueError("Initial investment must be a positive number.")
@@ -41,120 +54,286 @@ def calculate_all_metrics(
     initial_investment_negative = -initial_investment_positive
     results = {}
 
+    # Build the cash flow arrays once and share them across all metrics
+    cash_flows = np.asarray(future_cash_flows, dtype=np.float64)
+    all_cash_flows = np.empty(len(cash_flows) + 1, dtype=np.float64)
+    all_cash_flows[0] = initial_investment_negative
+    all_cash_flows[1:] = cash_flows
+
+    # Discount factors for years 1..N, computed once and reused by every metric
+    n_years = len(cash_flows)
+    discount_factors = _discount_factors(rate, n_years)
+    pv_per_year = cash_flows / discount_factors
+
     # --- 1. Net Present Value (NPV) ---
-    pv_future_flows = npf.npv(rate, future_cash_flows)
+    pv_future_flows = float(pv_per_year.sum())
     results['npv'] = pv_future_flows + initial_investment_negative
 
     # --- 2. Internal Rate of Return (IRR) ---
-    all_cash_flows = [initial_investment_negative] + future_cash_flows
-    try:
-        irr_value = npf.irr(all_cash_flows)
-        # Check if IRR is a valid number
-        if np.isnan(irr_value) or np.isinf(irr_value):
-            results['irr'] = "N/A (No Valid Solution)"
-        else:
-            results['irr'] = irr_value
-    except (ValueError, RuntimeError):
-        results['irr'] = "N/A (Calculation Error)"
+    if _wants(metrics, 'irr'):
+        try:
+            irr_value = _solve_irr(all_cash_flows)
+            # Check if IRR is a valid number
+            if np.isnan(irr_value) or np.isinf(irr_value):
+                results['irr'] = "N/A (No Valid Solution)"
+            else:
+                results['irr'] = irr_value
+        except (ValueError, RuntimeError):
+            results['irr'] = "N/A (Calculation Error)"
 
     # --- 3. Modified Internal Rate of Return (MIRR) ---
-    try:
-        mirr_value = npf.mirr(all_cash_flows, finance_rate, reinvestment_rate)
-        if np.isnan(mirr_value) or np.isinf(mirr_value):
-            results['mirr'] = "N/A (No Valid Solution)"
-        else:
-            results['mirr'] = mirr_value
-    except (ValueError, RuntimeError):
-        results['mirr'] = "N/A (Calculation Error)"
-
-    # --- 4. Payback Period ---
-    results['payback_period'] = _calculate_payback(
-        initial_investment_positive, future_cash_flows
-    )
-
-    # --- 5. Discounted Payback Period ---
-    results['discounted_payback_period'] = _calculate_discounted_payback(
-        rate, initial_investment_positive, future_cash_flows
-    )
+    if _wants(metrics, 'mirr'):
+        try:
+            mirr_value = _mirr(all_cash_flows, finance_rate, reinvestment_rate)
+            if np.isnan(mirr_value) or np.isinf(mirr_value):
+                results['mirr'] = "N/A (No Valid Solution)"
+            else:
+                results['mirr'] = mirr_value
+        except (ValueError, RuntimeError):
+            results['mirr'] = "N/A (Calculation Error)"
+
+    # --- 4 & 5. Payback and Discounted Payback Periods ---
+    if _wants(metrics, 'payback_period') or _wants(metrics, 'discounted_payback_period'):
+        results['payback_period'], results['discounted_payback_period'] = _calculate_payback_periods(
+            initial_investment_positive, cash_flows, pv_per_year
+        )
 
     # --- 6. Profitability Index (PI) ---
-    if initial_investment_positive == 0:
-        results['profitability_index'] = "N/A (No Investment)"
-    else:
-        results['profitability_index'] = pv_future_flows / initial_investment_positive
+    if _wants(metrics, 'profitability_index'):
+        if initial_investment_positive == 0:
+            results['profitability_index'] = "N/A (No Investment)"
+        else:
+            results['profitability_index'] = pv_future_flows / initial_investment_positive
 
     # --- 7. Equivalent Annual Annuity (EAA) ---
-    n_years = len(future_cash_flows)
-    if results['npv'] != 0 and n_years > 0:
-        try:
-            # EAA = NPV / Present Value Annuity Factor
-            pv_annuity_factor = (1 - (1 + rate) ** -n_years) / rate if rate != 0 else n_years
-            results['eaa'] = results['npv'] / pv_annuity_factor
-        except (ZeroDivisionError, ValueError):
-            results['eaa'] = "N/A (Calculation Error)"
-    else:
-        results['eaa'] = "N/A"
+    if _wants(metrics, 'eaa'):
+        if results['npv'] != 0 and n_years > 0:
+            try:
+                # EAA = NPV / Present Value Annuity Factor, where the factor
+                # (1 - (1 + rate) ** -n) / rate is evaluated with expm1/log1p to
+                # stay accurate for rates close to zero
+                if rate != 0:
+                    pv_annuity_factor = -math.expm1(-n_years * math.log1p(rate)) / rate
+                else:
+                    pv_annuity_factor = n_years
+                results['eaa'] = results['npv'] / pv_annuity_factor
+            except (ZeroDivisionError, ValueError):
+                results['eaa'] = "N/A (Calculation Error)"
+        else:
+            results['eaa'] = "N/A"
 
     # --- 8. Benefit-Cost Ratio (BCR) ---
-    if initial_investment_positive > 0:
-        results['benefit_cost_ratio'] = pv_future_flows / initial_investment_positive
-    else:
-        results['benefit_cost_ratio'] = "N/A"
+    if _wants(metrics, 'benefit_cost_ratio'):
+        if initial_investment_positive > 0:
+            results['benefit_cost_ratio'] = pv_future_flows / initial_investment_positive
+        else:
+            results['benefit_cost_ratio'] = "N/A"
+
+    total_future_cash_flow = float(cash_flows.sum())
 
     # --- 9. Total Cash Flow ---
-    results['total_cash_flow'] = sum(future_cash_flows) - initial_investment_positive
+    if _wants(metrics, 'total_cash_flow'):
+        results['total_cash_flow'] = total_future_cash_flow - initial_investment_positive
 
     # --- 10. Average Annual Cash Flow ---
-    results['avg_annual_cash_flow'] = sum(future_cash_flows) / len(future_cash_flows)
+    if _wants(metrics, 'avg_annual_cash_flow'):
+        results['avg_annual_cash_flow'] = total_future_cash_flow / n_years
+
+    # --- 11. Discounted Cash Flows (per year, for reports) ---
+    if _wants(metrics, 'discounted_cash_flows'):
+        results['discounted_cash_flows'] = pv_per_year.tolist()
 
     return results
 
 
-def _calculate_payback(investment: float, cash_flows: List[float]) -> Union[float, str]:
-    """Calculates the simple payback period."""
-    cumulative_cash_flow = 0.0
-    for i, cash_flow in enumerate(cash_flows):
-        year = i + 1
-        cumulative_cash_flow += cash_flow
+def _wants(metrics: Optional[Set[str]], key: str) -> bool:
+    """Checks whether a metric was requested; None means all metrics."""
+    return metrics is None or key in metrics
+
+
+@lru_cache(maxsize=256)
+def _discount_factors(rate: float, n_years: int) -> np.ndarray:
+    """
+    Returns (1 + rate) ** t for years 1..n_years.
+
+    Streamlit reruns the script on every interaction, so the same tables are
+    requested repeatedly; they are cached and marked read-only so the shared
+    array cannot be modified by a caller.
+    """
+    factors = (1.0 + rate) ** np.arange(1, n_years + 1)
+    factors.setflags(write=False)
+    return factors
+
 
-        if cumulative_cash_flow >= investment:
-            # Calculate exact payback with fractional year
-            last_year_cumulative = cumulative_cash_flow - cash_flow
-            needed_from_this_year = investment - last_year_cumulative
+def _solve_irr(cash_flows: np.ndarray) -> float:
+    """
+    Solves for IRR, using the fast Newton/bisection path only where the root is unique.
 
-            if cash_flow <= 0:
-                continue
+    A series with more than one sign change can have several IRRs; those go
+    straight to npf.irr so the reported root stays the one it picks (the one
+    closest to zero), whether or not pyxirr is installed.
+    """
+    signs = np.sign(cash_flows[cash_flows != 0])
+    if np.count_nonzero(np.diff(signs)) == 1:
+        irr_value = _irr_newton(cash_flows)
+        if np.isnan(irr_value):
+            irr_value = _irr_fallback(cash_flows)
+        return irr_value
+    return npf.irr(cash_flows)
+
+
+def _irr_newton(
+        cash_flows: np.ndarray,
+        guess: float = 0.1,
+        tol: float = 1e-9,
+        maxiter: int = 100
+) -> float:
+    """
+    Solves for IRR with Newton-Raphson, falling back to bisection if Newton diverges.
 
-            payback = (year - 1) + (needed_from_this_year / cash_flow)
-            return round(payback, 2)
+    Args:
+        cash_flows: Cash flows for years 0, 1, 2, ...
+        guess: Starting rate for Newton iterations
+        tol: Convergence tolerance on the rate
+        maxiter: Maximum number of Newton iterations
 
-    return "Never"
+    Returns:
+        The IRR, or NaN if no root could be found
+    """
+    values = cash_flows.tolist()
+    rate = guess
+    for _ in range(maxiter):
+        # NPV and its derivative in a single pass, carrying (1 + rate) ** -year
+        # as a running product instead of raising to a power per term
+        discount = 1.0 / (1.0 + rate)
+        factor = 1.0
+        npv = 0.0
+        d_npv = 0.0
+        for year, cash_flow in enumerate(values):
+            npv += cash_flow * factor
+            d_npv -= year * cash_flow * factor * discount
+            factor *= discount
+
+        if d_npv == 0:
+            break
+
+        new_rate = rate - npv / d_npv
+        if not np.isfinite(new_rate) or new_rate <= -1:
+            break
+        if abs(new_rate - rate) < tol:
+            return float(new_rate)
+        rate = new_rate
+
+    return _irr_bisect(cash_flows, tol)
+
+
+def _irr_bisect(cash_flows: np.ndarray, tol: float = 1e-9, maxiter: int = 200) -> float:
+    """Solves for IRR by bisection, returning NaN if no bracketed root is found."""
+    years = np.arange(len(cash_flows))
+
+    def npv_at(rate: float) -> float:
+        # exp/log1p form; long horizons overflow to inf here and are rejected below
+        with np.errstate(over='ignore', invalid='ignore'):
+            return float((cash_flows * np.exp(-years * np.log1p(rate))).sum())
+
+    low, high = -0.99, 1.0
+    npv_low, npv_high = npv_at(low), npv_at(high)
+    # Widen the upper bound until the NPV changes sign
+    while np.isfinite(npv_low * npv_high) and npv_low * npv_high > 0 and high < 1e6:
+        high *= 10
+        npv_high = npv_at(high)
+    # A NaN or inf end point makes every comparison below meaningless
+    if not (np.isfinite(npv_low) and np.isfinite(npv_high)) or npv_low * npv_high > 0:
+        return float('nan')
+
+    mid = (low + high) / 2
+    for _ in range(maxiter):
+        mid = (low + high) / 2
+        npv_mid = npv_at(mid)
+        if npv_mid == 0 or (high - low) / 2 < tol:
+            break
+        if npv_low * npv_mid < 0:
+            high = mid
+        else:
+            low, npv_low = mid, npv_mid
 
+    # Only report the midpoint if it actually zeroes the NPV
+    if not abs(npv_at(mid)) <= 1e-6 * np.abs(cash_flows).sum():
+        return float('nan')
+    return mid
 
-def _calculate_discounted_payback(rate: float, investment: float, cash_flows: List[float]) -> Union[float, str]:
-    """Calculates the discounted payback period."""
-    cumulative_discounted_cash_flow = 0.0
-    for i, cash_flow in enumerate(cash_flows):
-        year = i + 1
-        discounted_cf = cash_flow / ((1 + rate) ** year)
-        cumulative_discounted_cash_flow += discounted_cf
 
-        if cumulative_discounted_cash_flow >= investment:
-            last_year_cumulative_discounted = cumulative_discounted_cash_flow - discounted_cf
-            needed_from_this_year = investment - last_year_cumulative_discounted
+def _irr_fallback(cash_flows: np.ndarray) -> float:
+    """
+    Solves for IRR with pyxirr when installed, otherwise with npf.irr.
 
-            if discounted_cf <= 0:
-                continue
+    Only called for series with a unique IRR; pyxirr can pick a different
+    root than npf.irr when there are several.
+    """
+    if _HAS_PYXIRR:
+        irr_value = pyxirr.irr(cash_flows, silent=True)
+        return float('nan') if irr_value is None else irr_value
+    return npf.irr(cash_flows)
 
-            discounted_payback = (year - 1) + (needed_from_this_year / discounted_cf)
-            return round(discounted_payback, 2)
 
-    return "Never"
+def _mirr(cash_flows: np.ndarray, finance_rate: float, reinvestment_rate: float) -> float:
+    """
+    Calculates MIRR in closed form from the FV of inflows and the PV of outflows.
+
+    Returns NaN when the cash flows do not contain both inflows and outflows,
+    or contain any non-finite value.
+    """
+    if not np.isfinite(cash_flows).all():
+        return float('nan')
+
+    n_periods = len(cash_flows) - 1
+    years = np.arange(len(cash_flows))
+
+    positive = np.where(cash_flows > 0, cash_flows, 0.0)
+    negative = np.where(cash_flows < 0, cash_flows, 0.0)
+    fv_positive = (positive * (1 + reinvestment_rate) ** (n_periods - years)).sum()
+    pv_negative = (negative / (1 + finance_rate) ** years).sum()
+
+    if fv_positive == 0 or pv_negative == 0:
+        return float('nan')
+    return float((fv_positive / -pv_negative) ** (1.0 / n_periods) - 1)
+
+
+def _calculate_payback_periods(
+        investment: float,
+        cash_flows: np.ndarray,
+        discounted_cash_flows: np.ndarray
+) -> Tuple[Union[float, str], Union[float, str]]:
+    """Calculates the simple and discounted payback periods in one pass."""
+    # Row 0 holds undiscounted flows, row 1 discounted flows
+    flows = np.vstack([cash_flows, discounted_cash_flows])
+    cumulative = np.cumsum(flows, axis=1)
+
+    payback = _payback_from_cumulative(investment, flows[0], cumulative[0])
+    discounted_payback = _payback_from_cumulative(investment, flows[1], cumulative[1])
+    return payback, discounted_payback
+
+
+def _payback_from_cumulative(
+        investment: float,
+        cash_flows: np.ndarray,
+        cumulative: np.ndarray
+) -> Union[float, str]:
+    """Finds the fractional year in which the cumulative cash flow first recovers the investment."""
+    recovered = cumulative >= investment
+    if not recovered.any():
+        return "Never"
+
+    # First year the investment is recovered; its cash flow is positive since
+    # the cumulative total was still short of the investment the year before
+    idx = int(np.argmax(recovered))
+    needed_from_this_year = investment - (cumulative[idx] - cash_flows[idx])
+    return round(idx + float(needed_from_this_year / cash_flows[idx]), 2)
 
 
 def calculate_npv_profile(
         initial_investment_positive: float,
-        future_cash_flows: List[float],
+        future_cash_flows: Union[List[float], np.ndarray],
         rate_range: Tuple[float, float] = (0, 0.50),
         num_points: int = 50
 ) -> Tuple[List[float], List[float]]:
@@ -163,7 +342,7 @@ def calculate_npv_profile(
 
     Args:
         initial_investment_positive: Initial investment as positive number
-        future_cash_flows: List of future cash flows
+        future_cash_flows: List or array of future cash flows
         rate_range: Tuple of (min_rate, max_rate) for analysis
         num_points: Number of points to calculate
 
@@ -171,21 +350,43 @@ def calculate_npv_profile(
         Tuple of (rates, npvs) lists
     """
     rates = np.linspace(rate_range[0], rate_range[1], num_points)
-    npvs = []
 
-    initial_investment_negative = -initial_investment_positive
+    # The profile only feeds a chart, so it is evaluated in float32 to halve its
+    # memory traffic; calculate_all_metrics stays float64
+    cash_flows = np.asarray(future_cash_flows, dtype=np.float32)
+    discount_matrix = _profile_discount_matrix(
+        rate_range[0], rate_range[1], num_points, len(cash_flows)
+    )
 
-    for rate in rates:
-        pv_future_flows = npf.npv(rate, future_cash_flows)
-        npv = pv_future_flows + initial_investment_negative
-        npvs.append(npv)
+    # Discount every cash flow at every rate with one matrix-vector product
+    npvs = discount_matrix @ cash_flows - initial_investment_positive
 
-    return rates.tolist(), npvs
+    return rates.tolist(), npvs.tolist()
+
+
+@lru_cache(maxsize=256)
+def _profile_discount_matrix(
+        min_rate: float,
+        max_rate: float,
+        num_points: int,
+        n_years: int
+) -> np.ndarray:
+    """
+    Returns the read-only float32 (rates x years) matrix of (1 + r) ** -t for the NPV profile.
+
+    Computed as exp(-t * log1p(r)), which underflows quietly to zero on long
+    horizons where a direct float32 power would overflow.
+    """
+    rates = np.linspace(min_rate, max_rate, num_points).astype(np.float32)
+    years = np.arange(1, n_years + 1, dtype=np.float32)
+    matrix = np.exp(-years[None, :] * np.log1p(rates)[:, None])
+    matrix.setflags(write=False)
+    return matrix
 
 
 def calculate_cumulative_cash_flows(
         initial_investment_positive: float,
-        future_cash_flows: List[float],
+        future_cash_flows: Union[List[float], np.ndarray],
         rate: float
 ) -> Tuple[List[int], List[float], List[float]]:
     """
@@ -194,25 +395,27 @@ def calculate_cumulative_cash_flows(
     Returns:
         Tuple of (years, cumulative_undiscounted, cumulative_discounted)
     """
-    years = [0] + list(range(1, len(future_cash_flows) + 1))
-    cumulative_undiscounted = [-initial_investment_positive]
-    cumulative_discounted = [-initial_investment_positive]
+    cash_flows = np.asarray(future_cash_flows, dtype=np.float64)
+    n_years = len(cash_flows)
+    years = list(range(n_years + 1))
 
-    for i, cf in enumerate(future_cash_flows):
-        year = i + 1
-        # Undiscounted cumulative
-        cumulative_undiscounted.append(cumulative_undiscounted[-1] + cf)
+    # Preallocate with the Year 0 outlay in front, then accumulate in place
+    cumulative_undiscounted = np.empty(n_years + 1)
+    cumulative_undiscounted[0] = -initial_investment_positive
+    cumulative_undiscounted[1:] = cash_flows
+    np.cumsum(cumulative_undiscounted, out=cumulative_undiscounted)
 
-        # Discounted cumulative
-        discounted_cf = cf / ((1 + rate) ** year)
-        cumulative_discounted.append(cumulative_discounted[-1] + discounted_cf)
+    cumulative_discounted = np.empty(n_years + 1)
+    cumulative_discounted[0] = -initial_investment_positive
+    np.divide(cash_flows, _discount_factors(rate, n_years), out=cumulative_discounted[1:])
+    np.cumsum(cumulative_discounted, out=cumulative_discounted)
 
-    return years, cumulative_undiscounted, cumulative_discounted
+    return years, cumulative_undiscounted.tolist(), cumulative_discounted.tolist()
 
 
 def perform_sensitivity_analysis(
         initial_investment_positive: float,
-        future_cash_flows: List[float],
+        future_cash_flows: Union[List[float], np.ndarray],
         base_rate: float,
         variation_percent: float = 20.0
 ) -> Dict[str, Dict[str, float]]:
@@ -229,19 +432,15 @@ def perform_sensitivity_analysis(
         Dictionary with sensitivity results
     """
     variation = variation_percent / 100.0
+    scale = np.array([1 - variation, 1.0, 1 + variation])
+    cash_flows = np.asarray(future_cash_flows, dtype=np.float64)
+    n_years = len(cash_flows)
     results = {}
 
-    # Discount rate sensitivity
-    rates = [
-        base_rate * (1 - variation),
-        base_rate,
-        base_rate * (1 + variation)
-    ]
-    rate_npvs = []
-    for r in rates:
-        pv = npf.npv(r, future_cash_flows)
-        npv = pv - initial_investment_positive
-        rate_npvs.append(npv)
+    # Discount rate sensitivity: base cash flows at each of the three rates
+    rate_factors = np.vstack([_discount_factors(float(r), n_years) for r in base_rate * scale])
+    rate_pvs = (cash_flows[None, :] / rate_factors).sum(axis=1)
+    rate_npvs = rate_pvs - initial_investment_positive
 
     results['discount_rate'] = {
         'low': rate_npvs[0],
@@ -249,17 +448,10 @@ def perform_sensitivity_analysis(
         'high': rate_npvs[2]
     }
 
-    # Cash flow sensitivity
-    cf_variations = [
-        [cf * (1 - variation) for cf in future_cash_flows],
-        future_cash_flows,
-        [cf * (1 + variation) for cf in future_cash_flows]
-    ]
-    cf_npvs = []
-    for cfs in cf_variations:
-        pv = npf.npv(base_rate, cfs)
-        npv = pv - initial_investment_positive
-        cf_npvs.append(npv)
+    # Cash flow sensitivity: each scaled cash flow row at the base rate
+    cf_variations = scale[:, None] * cash_flows[None, :]
+    cf_pvs = (cf_variations / _discount_factors(base_rate, n_years)[None, :]).sum(axis=1)
+    cf_npvs = cf_pvs - initial_investment_positive
 
     results['cash_flows'] = {
         'low': cf_npvs[0],
@@ -267,17 +459,8 @@ def perform_sensitivity_analysis(
         'high': cf_npvs[2]
     }
 
-    # Initial investment sensitivity
-    inv_variations = [
-        initial_investment_positive * (1 - variation),
-        initial_investment_positive,
-        initial_investment_positive * (1 + variation)
-    ]
-    inv_npvs = []
-    pv = npf.npv(base_rate, future_cash_flows)
-    for inv in inv_variations:
-        npv = pv - inv
-        inv_npvs.append(npv)
+    # Initial investment sensitivity: the base PV does not change
+    inv_npvs = cf_pvs[1] - initial_investment_positive * scale
 
     results['initial_investment'] = {
         'low': inv_npvs[0],
@@ -1,10 +1,12 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import capital_budgeting_logic as logic
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Union
+from datetime import datetime
 import io
 
 # Set page configuration
@@ -103,6 +105,602 @@ def get_decision_text(results: Dict[str, Any], rate: float) -> Tuple[str, bool]:
     return "\n\n".join(decision_lines), is_acceptable
 
 
+@st.cache_data(show_spinner=False)
+def _cached_metrics(
+        rate: float,
+        initial_investment: float,
+        cash_flows: np.ndarray,
+        reinvestment_rate: Optional[float],
+        finance_rate: Optional[float]
+) -> Dict[str, Any]:
+    """Memoized calculate_all_metrics; st.cache_data hashes the cash flow array by content."""
+    return logic.calculate_all_metrics(
+        rate, initial_investment, cash_flows, reinvestment_rate, finance_rate
+    )
+
+
+@st.cache_data(show_spinner=False)
+def _cached_cumulative_cash_flows(
+        initial_investment: float,
+        cash_flows: np.ndarray,
+        rate: float
+) -> Tuple[List[int], List[float], List[float]]:
+    """Memoized calculate_cumulative_cash_flows for the payback chart."""
+    return logic.calculate_cumulative_cash_flows(initial_investment, cash_flows, rate)
+
+
+@st.cache_data(show_spinner=False)
+def _cached_npv_profile(
+        initial_investment: float,
+        cash_flows: np.ndarray
+) -> Tuple[List[float], List[float]]:
+    """Memoized calculate_npv_profile for the NPV profile chart."""
+    return logic.calculate_npv_profile(initial_investment, cash_flows)
+
+
+@st.cache_data(show_spinner=False)
+def _cached_sensitivity_analysis(
+        initial_investment: float,
+        cash_flows: np.ndarray,
+        rate: float,
+        variation_percent: float
+) -> Dict[str, Dict[str, float]]:
+    """Memoized perform_sensitivity_analysis, so moving the slider back to a seen value is free."""
+    return logic.perform_sensitivity_analysis(initial_investment, cash_flows, rate, variation_percent)
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def build_cashflow_timeline_fig(initial_investment: float, cash_flows: np.ndarray) -> go.Figure:
+    """Builds the cash flow timeline bar chart; cached so unchanged inputs reuse the Figure."""
+    years = list(range(len(cash_flows) + 1))
+    cash_flows_with_initial = np.concatenate(([-initial_investment], cash_flows))
+
+    fig1 = go.Figure()
+    colors = np.where(cash_flows_with_initial < 0, 'red', 'green')
+
+    fig1.add_trace(go.Bar(
+        x=years,
+        y=cash_flows_with_initial,
+        marker_color=colors,
+        text=[*map('${:,.0f}'.format, cash_flows_with_initial)],
+        textposition='outside',
+        name='Cash Flow'
+    ))
+
+    fig1.update_layout(
+        title="Cash Flow Timeline",
+        xaxis_title="Year",
+        yaxis_title="Cash Flow ($)",
+        showlegend=False,
+        height=400,
+        hovermode='x unified'
+    )
+
+    return fig1
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def build_cumulative_fig(initial_investment: float, cash_flows: np.ndarray, rate: float) -> go.Figure:
+    """Builds the cumulative (payback) cash flow chart."""
+    years_cum, cum_undiscounted, cum_discounted = _cached_cumulative_cash_flows(
+        initial_investment, cash_flows, rate
+    )
+
+    fig2 = go.Figure()
+
+    fig2.add_trace(go.Scatter(
+        x=years_cum,
+        y=cum_undiscounted,
+        mode='lines+markers',
+        name='Cumulative (Undiscounted)',
+        line=dict(color='blue', width=2)
+    ))
+
+    fig2.add_trace(go.Scatter(
+        x=years_cum,
+        y=cum_discounted,
+        mode='lines+markers',
+        name='Cumulative (Discounted)',
+        line=dict(color='orange', width=2)
+    ))
+
+    fig2.add_hline(y=0, line_dash="dash", line_color="red", annotation_text="Break-even")
+
+    fig2.update_layout(
+        title="Cumulative Cash Flow (Payback Analysis)",
+        xaxis_title="Year",
+        yaxis_title="Cumulative Cash Flow ($)",
+        height=400,
+        hovermode='x unified'
+    )
+
+    return fig2
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def build_npv_profile_fig(
+        initial_investment: float,
+        cash_flows: np.ndarray,
+        discount_rate: float,
+        irr: Union[float, str]
+) -> go.Figure:
+    """Builds the NPV profile chart, marking the WACC and (if available) the IRR."""
+    rates, npvs = _cached_npv_profile(initial_investment, cash_flows)
+
+    fig3 = go.Figure()
+
+    fig3.add_trace(go.Scatter(
+        x=[r * 100 for r in rates],
+        y=npvs,
+        mode='lines',
+        name='NPV',
+        line=dict(color='purple', width=3),
+        fill='tozeroy'
+    ))
+
+    fig3.add_vline(
+        x=discount_rate,
+        line_dash="dash",
+        line_color="green",
+        annotation_text=f"Current WACC: {discount_rate:.1f}%"
+    )
+
+    fig3.add_hline(y=0, line_dash="dash", line_color="red")
+
+    # Mark IRR if available
+    if isinstance(irr, float):
+        fig3.add_vline(
+            x=irr * 100,
+            line_dash="dot",
+            line_color="blue",
+            annotation_text=f"IRR: {irr * 100:.1f}%"
+        )
+
+    fig3.update_layout(
+        title="NPV Profile (NPV at Different Discount Rates)",
+        xaxis_title="Discount Rate (%)",
+        yaxis_title="Net Present Value ($)",
+        height=400,
+        hovermode='x unified'
+    )
+
+    return fig3
+
+
+def _sensitivity_columns(
+        sensitivity_results: Dict[str, Dict[str, float]]
+) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+    """Splits sensitivity results into display names and low/base/high NPV arrays."""
+    names = [variable.replace('_', ' ').title() for variable in sensitivity_results]
+    lows, bases, highs = (
+        np.fromiter((values[case] for values in sensitivity_results.values()), dtype=np.float64)
+        for case in ('low', 'base', 'high')
+    )
+    return names, lows, bases, highs
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def build_tornado_fig(sensitivity_results: Dict[str, Dict[str, float]], variation_pct: int) -> go.Figure:
+    """Builds the tornado chart of NPV sensitivity."""
+    names, lows, bases, highs = _sensitivity_columns(sensitivity_results)
+    df_tornado = pd.DataFrame({
+        'Variable': names,
+        'Negative Impact': lows - bases,
+        'Positive Impact': highs - bases,
+        'Total Range': np.abs(highs - lows)
+    }).sort_values('Total Range', ascending=True)
+
+    fig4 = go.Figure()
+
+    fig4.add_trace(go.Bar(
+        y=df_tornado['Variable'],
+        x=df_tornado['Negative Impact'],
+        name=f'-{variation_pct}%',
+        orientation='h',
+        marker_color='red'
+    ))
+
+    fig4.add_trace(go.Bar(
+        y=df_tornado['Variable'],
+        x=df_tornado['Positive Impact'],
+        name=f'+{variation_pct}%',
+        orientation='h',
+        marker_color='green'
+    ))
+
+    fig4.update_layout(
+        title="Tornado Chart - NPV Sensitivity",
+        xaxis_title="Change in NPV ($)",
+        yaxis_title="Variable",
+        barmode='relative',
+        height=400
+    )
+
+    return fig4
+
+
+@st.fragment
+def render_sensitivity(inputs: Dict[str, Any]) -> None:
+    """Renders the Sensitivity Analysis tab; as a fragment, its slider reruns only this tab."""
+    st.header("🔍 Sensitivity Analysis")
+    st.markdown("Analyze how changes in key inputs affect NPV")
+
+    variation_pct = st.slider(
+        "Variation Percentage",
+        min_value=5,
+        max_value=50,
+        value=20,
+        step=5,
+        help="Test ±X% changes in inputs"
+    )
+
+    sensitivity_results = _cached_sensitivity_analysis(
+        inputs['initial_investment'],
+        inputs['future_cash_flows'],
+        inputs['rate'],
+        variation_pct
+    )
+
+    # Create sensitivity table
+    names, lows, bases, highs = _sensitivity_columns(sensitivity_results)
+    df_sensitivity = pd.DataFrame({
+        'Variable': names,
+        f'-{variation_pct}%': lows,
+        'Base Case': bases,
+        f'+{variation_pct}%': highs,
+        'Range': highs - lows
+    })
+    st.dataframe(
+        df_sensitivity.style.format({column: "${:,.2f}" for column in df_sensitivity.columns[1:]}),
+        use_container_width=True
+    )
+
+    # Tornado chart
+    st.plotly_chart(build_tornado_fig(sensitivity_results, variation_pct), use_container_width=True)
+
+
+def build_cash_flow_schedule(
+        initial_investment: float,
+        cash_flows: np.ndarray,
+        discounted_cash_flows: List[float],
+        rate: float
+) -> pd.DataFrame:
+    """Builds the year-by-year cash flow schedule shown in the report and exported as CSV."""
+    # Running totals come from the same cached cumsum that drives the payback chart
+    years, cumulative, cumulative_discounted = _cached_cumulative_cash_flows(
+        initial_investment, cash_flows, rate
+    )
+
+    return pd.DataFrame({
+        'Year': years,
+        'Cash Flow': np.concatenate(([-initial_investment], cash_flows)),
+        'Discounted CF': np.concatenate(([-initial_investment], discounted_cash_flows)),
+        'Cumulative CF': cumulative,
+        'Cumulative Discounted CF': cumulative_discounted
+    })
+
+
+# Display formatters for numeric results, keyed by the kind of value
+_FORMATTERS = {
+    'pct': lambda v: f"{v * 100:.2f}%",
+    'dollar': lambda v: f"${v:,.2f}",
+    'years': lambda v: f"{v} years",
+    'ratio': lambda v: f"{v:.3f}"
+}
+
+
+def _fmt(value: Any, kind: str) -> Any:
+    """Formats a numeric result for display; non-numeric results such as 'N/A' pass through."""
+    return _FORMATTERS[kind](value) if isinstance(value, float) else value
+
+
+def build_metrics_display(results: Dict[str, Any]) -> Dict[str, str]:
+    """Formats every metric for the Detailed Report table and the CSV export."""
+    return {
+        'Net Present Value (NPV)': _fmt(results['npv'], 'dollar'),
+        'Internal Rate of Return (IRR)': _fmt(results['irr'], 'pct'),
+        'Modified IRR (MIRR)': _fmt(results['mirr'], 'pct'),
+        'Profitability Index (PI)': _fmt(results['profitability_index'], 'ratio'),
+        'Payback Period': _fmt(results['payback_period'], 'years'),
+        'Discounted Payback Period': _fmt(results['discounted_payback_period'], 'years'),
+        'Equivalent Annual Annuity (EAA)': _fmt(results['eaa'], 'dollar'),
+        'Benefit-Cost Ratio': _fmt(results.get('benefit_cost_ratio', 'N/A'), 'ratio'),
+        'Total Cash Flow': _fmt(results.get('total_cash_flow', 0.0), 'dollar'),
+        'Average Annual Cash Flow': _fmt(results.get('avg_annual_cash_flow', 0.0), 'dollar')
+    }
+
+
+@st.cache_data(show_spinner=False)
+def _metrics_csv(metrics_items: Tuple[Tuple[str, str], ...]) -> bytes:
+    """Serializes the formatted metrics to CSV bytes once per distinct result set."""
+    return pd.DataFrame(metrics_items, columns=['Metric', 'Value']).to_csv(index=False).encode()
+
+
+@st.cache_data(show_spinner=False)
+def _cash_flow_csv(
+        initial_investment: float,
+        cash_flows: np.ndarray,
+        discounted_cash_flows: List[float],
+        rate: float
+) -> bytes:
+    """Serializes the cash flow schedule to CSV bytes once per distinct input set."""
+    df_cf = build_cash_flow_schedule(initial_investment, cash_flows, discounted_cash_flows, rate)
+    return df_cf.to_csv(index=False, float_format='%.2f').encode()
+
+
+@st.fragment
+def render_summary(results: Dict[str, Any], inputs: Dict[str, Any]) -> None:
+    """Renders the Summary tab."""
+    st.header(f"Project: {inputs['project_name']}")
+
+    # Key Metrics Row 1
+    col1, col2, col3, col4 = st.columns(4)
+
+    npv_val = results['npv']
+    with col1:
+        delta_color = "normal" if npv_val > 0 else "inverse"
+        st.metric(
+            label="Net Present Value (NPV)",
+            value=_fmt(npv_val, 'dollar'),
+            delta="✓ Accept" if npv_val > 0 else "✗ Reject",
+            delta_color=delta_color
+        )
+
+    irr_val = results['irr']
+    with col2:
+        if isinstance(irr_val, float):
+            irr_text = _fmt(irr_val, 'pct')
+            delta_text = f"{((irr_val - inputs['rate']) * 100):.2f}% vs WACC"
+            delta_color = "normal" if irr_val > inputs['rate'] else "inverse"
+        else:
+            irr_text = "N/A"
+            delta_text = None
+            delta_color = "off"
+
+        st.metric(
+            label="Internal Rate of Return (IRR)",
+            value=irr_text,
+            delta=delta_text,
+            delta_color=delta_color
+        )
+
+    mirr_val = results.get('mirr', 'N/A')
+    with col3:
+        if isinstance(mirr_val, float):
+            mirr_text = _fmt(mirr_val, 'pct')
+            delta_text = f"{((mirr_val - inputs['rate']) * 100):.2f}% vs WACC"
+            delta_color = "normal" if mirr_val > inputs['rate'] else "inverse"
+        else:
+            mirr_text = "N/A"
+            delta_text = None
+            delta_color = "off"
+
+        st.metric(
+            label="Modified IRR (MIRR)",
+            value=mirr_text,
+            delta=delta_text,
+            delta_color=delta_color
+        )
+
+    pi_val = results['profitability_index']
+    with col4:
+        if isinstance(pi_val, float):
+            pi_text = _fmt(pi_val, 'ratio')
+            delta_text = "✓ Pass" if pi_val > 1 else "✗ Fail"
+            delta_color = "normal" if pi_val > 1 else "inverse"
+        else:
+            pi_text = "N/A"
+            delta_text = None
+            delta_color = "off"
+
+        st.metric(
+            label="Profitability Index (PI)",
+            value=pi_text,
+            delta=delta_text,
+            delta_color=delta_color
+        )
+
+    st.markdown("---")
+
+    # Key Metrics Row 2
+    col5, col6, col7, col8 = st.columns(4)
+
+    with col5:
+        pb_val = results['payback_period']
+        st.metric(
+            label="Payback Period",
+            value=_fmt(pb_val, 'years')
+        )
+
+    with col6:
+        dpb_val = results['discounted_payback_period']
+        st.metric(
+            label="Discounted Payback",
+            value=_fmt(dpb_val, 'years')
+        )
+
+    with col7:
+        eaa_val = results.get('eaa', 'N/A')
+        st.metric(
+            label="Equivalent Annual Annuity",
+            value=_fmt(eaa_val, 'dollar') if isinstance(eaa_val, float) else "N/A"
+        )
+
+    with col8:
+        total_cf = results.get('total_cash_flow', 0)
+        st.metric(
+            label="Total Cash Flow",
+            value=_fmt(total_cf, 'dollar'),
+            delta="Positive" if total_cf > 0 else "Negative",
+            delta_color="normal" if total_cf > 0 else "inverse"
+        )
+
+    st.markdown("---")
+
+    # Decision Analysis
+    st.subheader("🎯 Decision Analysis")
+    decision_text, is_acceptable = get_decision_text(results, inputs['rate'])
+
+    if is_acceptable:
+        st.success(decision_text)
+    else:
+        st.error(decision_text)
+
+
+@st.fragment
+def render_viz(results: Dict[str, Any], inputs: Dict[str, Any]) -> None:
+    """Renders the Visualizations tab."""
+    st.header("📊 Visual Analytics")
+
+    # Cash Flow Timeline
+    st.plotly_chart(
+        build_cashflow_timeline_fig(inputs['initial_investment'], inputs['future_cash_flows']),
+        use_container_width=True
+    )
+
+    # Cumulative Cash Flow (Payback Visualization)
+    st.plotly_chart(
+        build_cumulative_fig(inputs['initial_investment'], inputs['future_cash_flows'], inputs['rate']),
+        use_container_width=True
+    )
+
+    # NPV Profile
+    st.plotly_chart(
+        build_npv_profile_fig(
+            inputs['initial_investment'],
+            inputs['future_cash_flows'],
+            inputs['discount_rate'],
+            results['irr']
+        ),
+        use_container_width=True
+    )
+
+
+@st.fragment
+def render_report(results: Dict[str, Any], inputs: Dict[str, Any]) -> None:
+    """Renders the Detailed Report tab."""
+    st.header("📋 Detailed Project Report")
+
+    # Project Summary
+    st.subheader("Project Information")
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown(f"""
+        **Project Name:** {inputs['project_name']}  
+        **Initial Investment:** ${inputs['initial_investment']:,.2f}  
+        **Discount Rate (WACC):** {inputs['discount_rate']:.2f}%  
+        **Project Duration:** {len(inputs['future_cash_flows'])} years
+        """)
+
+    with col2:
+        avg_cf = results.get('avg_annual_cash_flow', 0)
+        st.markdown(f"""
+        **Average Annual Cash Flow:** ${avg_cf:,.2f}  
+        **Total Undiscounted Cash Flow:** ${results.get('total_cash_flow', 0):,.2f}  
+        **Net Present Value:** ${results['npv']:,.2f}
+        """)
+
+    # Cash Flow Table
+    st.subheader("Cash Flow Schedule")
+    df_cf = build_cash_flow_schedule(
+        inputs['initial_investment'],
+        inputs['future_cash_flows'],
+        results['discounted_cash_flows'],
+        inputs['rate']
+    )
+    dollar_columns = ['Cash Flow', 'Discounted CF', 'Cumulative CF', 'Cumulative Discounted CF']
+    st.dataframe(
+        df_cf.style.format({column: "${:,.2f}" for column in dollar_columns}),
+        use_container_width=True
+    )
+
+    # All Metrics Summary
+    st.subheader("Complete Metrics Summary")
+
+    metrics_display = build_metrics_display(results)
+    df_metrics = pd.DataFrame(list(metrics_display.items()), columns=['Metric', 'Value'])
+    st.dataframe(df_metrics, use_container_width=True)
+
+
+@st.fragment
+def render_export(results: Dict[str, Any], inputs: Dict[str, Any]) -> None:
+    """Renders the Export tab."""
+    st.header("💾 Export Results")
+
+    metrics_display = build_metrics_display(results)
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("Export to CSV")
+
+        csv = _metrics_csv(tuple(metrics_display.items()))
+        st.download_button(
+            label="📥 Download CSV",
+            data=csv,
+            file_name=f"{inputs['project_name']}_analysis.csv",
+            mime="text/csv",
+            use_container_width=True
+        )
+
+    with col2:
+        st.subheader("Export Cash Flows")
+
+        csv_cf = _cash_flow_csv(
+            inputs['initial_investment'],
+            inputs['future_cash_flows'],
+            results['discounted_cash_flows'],
+            inputs['rate']
+        )
+        st.download_button(
+            label="📥 Download Cash Flow Schedule",
+            data=csv_cf,
+            file_name=f"{inputs['project_name']}_cashflows.csv",
+            mime="text/csv",
+            use_container_width=True
+        )
+
+    # Print-friendly summary
+    st.subheader("📄 Print-Friendly Summary")
+
+    decision_text, is_acceptable = get_decision_text(results, inputs['rate'])
+
+    summary_text = f"""
+# Capital Budgeting Analysis Report
+## Project: {inputs['project_name']}
+
+### Project Parameters
+- Initial Investment: ${inputs['initial_investment']:,.2f}
+- Discount Rate (WACC): {inputs['discount_rate']:.2f}%
+- Project Duration: {len(inputs['future_cash_flows'])} years
+
+### Key Financial Metrics
+- **Net Present Value (NPV):** {metrics_display['Net Present Value (NPV)']}
+- **Internal Rate of Return (IRR):** {metrics_display['Internal Rate of Return (IRR)']}
+- **Modified IRR (MIRR):** {metrics_display['Modified IRR (MIRR)']}
+- **Profitability Index (PI):** {metrics_display['Profitability Index (PI)']}
+- **Payback Period:** {metrics_display['Payback Period']}
+- **Discounted Payback Period:** {metrics_display['Discounted Payback Period']}
+
+### Recommendation
+{decision_text}
+
+---
+Report generated on: {st.session_state.calc_timestamp}
+"""
+
+    st.text_area("Copy this report:", summary_text, height=400)
+
+    st.download_button(
+        label="📥 Download Report (TXT)",
+        data=summary_text,
+        file_name=f"{inputs['project_name']}_report.txt",
+        mime="text/plain",
+        use_container_width=True
+    )
+
+
 # ============================================================================
 # MAIN APPLICATION
 # ============================================================================
@@ -190,7 +788,7 @@ input_method = st.sidebar.radio(
     help="Enter cash flows manually or upload a CSV file"
 )
 
-future_cash_flows = []
+future_cash_flows = np.empty(0)
 
 if input_method == "Manual Entry":
     num_years = st.sidebar.number_input(
@@ -203,6 +801,7 @@ if input_method == "Manual Entry":
     )
 
     st.sidebar.markdown("**Enter Cash Flows by Year:**")
+    manual_cash_flows = []
     for i in range(num_years):
         cf = st.sidebar.number_input(
             f"Year {i + 1} ($)",
@@ -211,7 +810,8 @@ if input_method == "Manual Entry":
             format="%.2f",
             key=f"cf_{i}"
         )
-        future_cash_flows.append(cf)
+        manual_cash_flows.append(cf)
+    future_cash_flows = np.array(manual_cash_flows, dtype=np.float64)
 
 else:  # CSV Upload
     uploaded_file = st.sidebar.file_uploader(
@@ -224,8 +824,12 @@ else:  # CSV Upload
         try:
             df = pd.read_csv(uploaded_file)
             if 'CashFlow' in df.columns:
-                future_cash_flows = df['CashFlow'].tolist()
-                st.sidebar.success(f"✅ Loaded {len(future_cash_flows)} years of data")
+                csv_cash_flows = df['CashFlow'].to_numpy(dtype=np.float64)
+                if np.isfinite(csv_cash_flows).all():
+                    future_cash_flows = csv_cash_flows
+                    st.sidebar.success(f"✅ Loaded {len(future_cash_flows)} years of data")
+                else:
+                    st.sidebar.error("CSV 'CashFlow' column must not contain blank or infinite values")
             else:
                 st.sidebar.error("CSV must have 'CashFlow' column")
         except Exception as e:
@@ -236,17 +840,22 @@ else:  # CSV Upload
 # --- Calculate Button ---
 calculate_button = st.sidebar.button("🚀 Calculate Metrics", type="primary", use_container_width=True)
 
-if calculate_button and future_cash_flows:
+if calculate_button and len(future_cash_flows) > 0:
     try:
         # Convert percentage to decimal
         rate = discount_rate / 100.0
 
         # Validate inputs
-        if not future_cash_flows:
+        if len(future_cash_flows) == 0:
             raise ValueError("At least one Future Cash Flow is required.")
 
+        # This one float64 array is shared by every chart, table and cached
+        # calculation on later reruns, so freeze it against accidental edits
+        future_cash_flows = np.asarray(future_cash_flows, dtype=np.float64)
+        future_cash_flows.setflags(write=False)
+
         # Calculate all metrics
-        results = logic.calculate_all_metrics(
+        results = _cached_metrics(
             rate,
             initial_investment,
             future_cash_flows,
@@ -257,6 +866,7 @@ if calculate_button and future_cash_flows:
         # Store in session state
         st.session_state.calculated = True
         st.session_state.results = results
+        st.session_state.calc_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         st.session_state.inputs = {
             'project_name': project_name,
             'initial_investment': initial_investment,
@@ -285,469 +895,19 @@ if st.session_state.calculated and st.session_state.results:
     ])
 
     with tab1:
-        st.header(f"Project: {inputs['project_name']}")
-
-        # Key Metrics Row 1
-        col1, col2, col3, col4 = st.columns(4)
-
-        npv_val = results['npv']
-        with col1:
-            delta_color = "normal" if npv_val > 0 else "inverse"
-            st.metric(
-                label="Net Present Value (NPV)",
-                value=f"${npv_val:,.2f}",
-                delta="✓ Accept" if npv_val > 0 else "✗ Reject",
-                delta_color=delta_color
-            )
-
-        irr_val = results['irr']
-        with col2:
-            if isinstance(irr_val, float):
-                irr_text = f"{irr_val * 100:.2f}%"
-                delta_text = f"{((irr_val - inputs['rate']) * 100):.2f}% vs WACC"
-                delta_color = "normal" if irr_val > inputs['rate'] else "inverse"
-            else:
-                irr_text = "N/A"
-                delta_text = None
-                delta_color = "off"
-
-            st.metric(
-                label="Internal Rate of Return (IRR)",
-                value=irr_text,
-                delta=delta_text,
-                delta_color=delta_color
-            )
-
-        mirr_val = results.get('mirr', 'N/A')
-        with col3:
-            if isinstance(mirr_val, float):
-                mirr_text = f"{mirr_val * 100:.2f}%"
-                delta_text = f"{((mirr_val - inputs['rate']) * 100):.2f}% vs WACC"
-                delta_color = "normal" if mirr_val > inputs['rate'] else "inverse"
-            else:
-                mirr_text = "N/A"
-                delta_text = None
-                delta_color = "off"
-
-            st.metric(
-                label="Modified IRR (MIRR)",
-                value=mirr_text,
-                delta=delta_text,
-                delta_color=delta_color
-            )
-
-        pi_val = results['profitability_index']
-        with col4:
-            if isinstance(pi_val, float):
-                pi_text = f"{pi_val:.3f}"
-                delta_text = "✓ Pass" if pi_val > 1 else "✗ Fail"
-                delta_color = "normal" if pi_val > 1 else "inverse"
-            else:
-                pi_text = "N/A"
-                delta_text = None
-                delta_color = "off"
-
-            st.metric(
-                label="Profitability Index (PI)",
-                value=pi_text,
-                delta=delta_text,
-                delta_color=delta_color
-            )
-
-        st.markdown("---")
-
-        # Key Metrics Row 2
-        col5, col6, col7, col8 = st.columns(4)
-
-        with col5:
-            pb_val = results['payback_period']
-            st.metric(
-                label="Payback Period",
-                value=f"{pb_val} years" if isinstance(pb_val, float) else pb_val
-            )
-
-        with col6:
-            dpb_val = results['discounted_payback_period']
-            st.metric(
-                label="Discounted Payback",
-                value=f"{dpb_val} years" if isinstance(dpb_val, float) else dpb_val
-            )
-
-        with col7:
-            eaa_val = results.get('eaa', 'N/A')
-            if isinstance(eaa_val, float):
-                st.metric(
-                    label="Equivalent Annual Annuity",
-                    value=f"${eaa_val:,.2f}"
-                )
-            else:
-                st.metric(
-                    label="Equivalent Annual Annuity",
-                    value="N/A"
-                )
-
-        with col8:
-            total_cf = results.get('total_cash_flow', 0)
-            st.metric(
-                label="Total Cash Flow",
-                value=f"${total_cf:,.2f}",
-                delta="Positive" if total_cf > 0 else "Negative",
-                delta_color="normal" if total_cf > 0 else "inverse"
-            )
-
-        st.markdown("---")
-
-        # Decision Analysis
-        st.subheader("🎯 Decision Analysis")
-        decision_text, is_acceptable = get_decision_text(results, inputs['rate'])
-
-        if is_acceptable:
-            st.success(decision_text)
-        else:
-            st.error(decision_text)
+        render_summary(results, inputs)
 
     with tab2:
-        st.header("📊 Visual Analytics")
-
-        # Cash Flow Timeline
-        years = list(range(len(inputs['future_cash_flows']) + 1))
-        cash_flows_with_initial = [-inputs['initial_investment']] + inputs['future_cash_flows']
-
-        fig1 = go.Figure()
-        colors = ['red' if cf < 0 else 'green' for cf in cash_flows_with_initial]
-
-        fig1.add_trace(go.Bar(
-            x=years,
-            y=cash_flows_with_initial,
-            marker_color=colors,
-            text=[f"${cf:,.0f}" for cf in cash_flows_with_initial],
-            textposition='outside',
-            name='Cash Flow'
-        ))
-
-        fig1.update_layout(
-            title="Cash Flow Timeline",
-            xaxis_title="Year",
-            yaxis_title="Cash Flow ($)",
-            showlegend=False,
-            height=400,
-            hovermode='x unified'
-        )
-
-        st.plotly_chart(fig1, use_container_width=True)
-
-        # Cumulative Cash Flow (Payback Visualization)
-        years_cum, cum_undiscounted, cum_discounted = logic.calculate_cumulative_cash_flows(
-            inputs['initial_investment'],
-            inputs['future_cash_flows'],
-            inputs['rate']
-        )
-
-        fig2 = go.Figure()
-
-        fig2.add_trace(go.Scatter(
-            x=years_cum,
-            y=cum_undiscounted,
-            mode='lines+markers',
-            name='Cumulative (Undiscounted)',
-            line=dict(color='blue', width=2)
-        ))
-
-        fig2.add_trace(go.Scatter(
-            x=years_cum,
-            y=cum_discounted,
-            mode='lines+markers',
-            name='Cumulative (Discounted)',
-            line=dict(color='orange', width=2)
-        ))
-
-        fig2.add_hline(y=0, line_dash="dash", line_color="red", annotation_text="Break-even")
-
-        fig2.update_layout(
-            title="Cumulative Cash Flow (Payback Analysis)",
-            xaxis_title="Year",
-            yaxis_title="Cumulative Cash Flow ($)",
-            height=400,
-            hovermode='x unified'
-        )
-
-        st.plotly_chart(fig2, use_container_width=True)
-
-        # NPV Profile
-        rates, npvs = logic.calculate_npv_profile(
-            inputs['initial_investment'],
-            inputs['future_cash_flows']
-        )
-
-        fig3 = go.Figure()
-
-        fig3.add_trace(go.Scatter(
-            x=[r * 100 for r in rates],
-            y=npvs,
-            mode='lines',
-            name='NPV',
-            line=dict(color='purple', width=3),
-            fill='tozeroy'
-        ))
-
-        fig3.add_vline(
-            x=inputs['discount_rate'],
-            line_dash="dash",
-            line_color="green",
-            annotation_text=f"Current WACC: {inputs['discount_rate']:.1f}%"
-        )
-
-        fig3.add_hline(y=0, line_dash="dash", line_color="red")
-
-        # Mark IRR if available
-        if isinstance(results['irr'], float):
-            fig3.add_vline(
-                x=results['irr'] * 100,
-                line_dash="dot",
-                line_color="blue",
-                annotation_text=f"IRR: {results['irr'] * 100:.1f}%"
-            )
-
-        fig3.update_layout(
-            title="NPV Profile (NPV at Different Discount Rates)",
-            xaxis_title="Discount Rate (%)",
-            yaxis_title="Net Present Value ($)",
-            height=400,
-            hovermode='x unified'
-        )
-
-        st.plotly_chart(fig3, use_container_width=True)
+        render_viz(results, inputs)
 
     with tab3:
-        st.header("🔍 Sensitivity Analysis")
-        st.markdown("Analyze how changes in key inputs affect NPV")
-
-        variation_pct = st.slider(
-            "Variation Percentage",
-            min_value=5,
-            max_value=50,
-            value=20,
-            step=5,
-            help="Test ±X% changes in inputs"
-        )
-
-        sensitivity_results = logic.perform_sensitivity_analysis(
-            inputs['initial_investment'],
-            inputs['future_cash_flows'],
-            inputs['rate'],
-            variation_pct
-        )
-
-        # Create sensitivity table
-        sensitivity_data = []
-        for variable, values in sensitivity_results.items():
-            sensitivity_data.append({
-                'Variable': variable.replace('_', ' ').title(),
-                f'-{variation_pct}%': f"${values['low']:,.2f}",
-                'Base Case': f"${values['base']:,.2f}",
-                f'+{variation_pct}%': f"${values['high']:,.2f}",
-                'Range': f"${values['high'] - values['low']:,.2f}"
-            })
-
-        df_sensitivity = pd.DataFrame(sensitivity_data)
-        st.dataframe(df_sensitivity, use_container_width=True)
-
-        # Tornado chart
-        tornado_data = []
-        for variable, values in sensitivity_results.items():
-            impact_negative = values['low'] - values['base']
-            impact_positive = values['high'] - values['base']
-            tornado_data.append({
-                'Variable': variable.replace('_', ' ').title(),
-                'Negative Impact': impact_negative,
-                'Positive Impact': impact_positive,
-                'Total Range': abs(impact_positive - impact_negative)
-            })
-
-        df_tornado = pd.DataFrame(tornado_data).sort_values('Total Range', ascending=True)
-
-        fig4 = go.Figure()
-
-        fig4.add_trace(go.Bar(
-            y=df_tornado['Variable'],
-            x=df_tornado['Negative Impact'],
-            name=f'-{variation_pct}%',
-            orientation='h',
-            marker_color='red'
-        ))
-
-        fig4.add_trace(go.Bar(
-            y=df_tornado['Variable'],
-            x=df_tornado['Positive Impact'],
-            name=f'+{variation_pct}%',
-            orientation='h',
-            marker_color='green'
-        ))
-
-        fig4.update_layout(
-            title="Tornado Chart - NPV Sensitivity",
-            xaxis_title="Change in NPV ($)",
-            yaxis_title="Variable",
-            barmode='relative',
-            height=400
-        )
-
-        st.plotly_chart(fig4, use_container_width=True)
+        render_sensitivity(inputs)
 
     with tab4:
-        st.header("📋 Detailed Project Report")
-
-        # Project Summary
-        st.subheader("Project Information")
-        col1, col2 = st.columns(2)
-
-        with col1:
-            st.markdown(f"""
-            **Project Name:** {inputs['project_name']}  
-            **Initial Investment:** ${inputs['initial_investment']:,.2f}  
-            **Discount Rate (WACC):** {inputs['discount_rate']:.2f}%  
-            **Project Duration:** {len(inputs['future_cash_flows'])} years
-            """)
-
-        with col2:
-            avg_cf = results.get('avg_annual_cash_flow', 0)
-            st.markdown(f"""
-            **Average Annual Cash Flow:** ${avg_cf:,.2f}  
-            **Total Undiscounted Cash Flow:** ${results.get('total_cash_flow', 0):,.2f}  
-            **Net Present Value:** ${results['npv']:,.2f}
-            """)
-
-        # Cash Flow Table
-        st.subheader("Cash Flow Schedule")
-        cf_data = []
-        cumulative = -inputs['initial_investment']
-        discounted_cumulative = -inputs['initial_investment']
-
-        cf_data.append({
-            'Year': 0,
-            'Cash Flow': f"-${inputs['initial_investment']:,.2f}",
-            'Discounted CF': f"-${inputs['initial_investment']:,.2f}",
-            'Cumulative CF': f"-${inputs['initial_investment']:,.2f}",
-            'Cumulative Discounted CF': f"-${inputs['initial_investment']:,.2f}"
-        })
-
-        for i, cf in enumerate(inputs['future_cash_flows']):
-            year = i + 1
-            discounted_cf = cf / ((1 + inputs['rate']) ** year)
-            cumulative += cf
-            discounted_cumulative += discounted_cf
-
-            cf_data.append({
-                'Year': year,
-                'Cash Flow': f"${cf:,.2f}",
-                'Discounted CF': f"${discounted_cf:,.2f}",
-                'Cumulative CF': f"${cumulative:,.2f}",
-                'Cumulative Discounted CF': f"${discounted_cumulative:,.2f}"
-            })
-
-        df_cf = pd.DataFrame(cf_data)
-        st.dataframe(df_cf, use_container_width=True)
-
-        # All Metrics Summary
-        st.subheader("Complete Metrics Summary")
-
-        metrics_display = {
-            'Net Present Value (NPV)': f"${results['npv']:,.2f}",
-            'Internal Rate of Return (IRR)': f"{results['irr'] * 100:.2f}%" if isinstance(results['irr'], float) else
-            results['irr'],
-            'Modified IRR (MIRR)': f"{results['mirr'] * 100:.2f}%" if isinstance(results['mirr'], float) else results[
-                'mirr'],
-            'Profitability Index (PI)': f"{results['profitability_index']:.3f}" if isinstance(
-                results['profitability_index'], float) else results['profitability_index'],
-            'Payback Period': f"{results['payback_period']} years" if isinstance(results['payback_period'], float) else
-            results['payback_period'],
-            'Discounted Payback Period': f"{results['discounted_payback_period']} years" if isinstance(
-                results['discounted_payback_period'], float) else results['discounted_payback_period'],
-            'Equivalent Annual Annuity (EAA)': f"${results['eaa']:,.2f}" if isinstance(results['eaa'], float) else
-            results['eaa'],
-            'Benefit-Cost Ratio': f"{results.get('benefit_cost_ratio', 'N/A'):.3f}" if isinstance(
-                results.get('benefit_cost_ratio'), float) else results.get('benefit_cost_ratio', 'N/A'),
-            'Total Cash Flow': f"${results.get('total_cash_flow', 0):,.2f}",
-            'Average Annual Cash Flow': f"${results.get('avg_annual_cash_flow', 0):,.2f}"
-        }
-
-        df_metrics = pd.DataFrame(list(metrics_display.items()), columns=['Metric', 'Value'])
-        st.dataframe(df_metrics, use_container_width=True)
+        render_report(results, inputs)
 
     with tab5:
-        st.header("💾 Export Results")
-
-        col1, col2 = st.columns(2)
-
-        with col1:
-            st.subheader("Export to CSV")
-
-            # Prepare data for CSV
-            export_data = {
-                'Metric': list(metrics_display.keys()),
-                'Value': list(metrics_display.values())
-            }
-            df_export = pd.DataFrame(export_data)
-
-            csv = df_export.to_csv(index=False)
-            st.download_button(
-                label="📥 Download CSV",
-                data=csv,
-                file_name=f"{inputs['project_name']}_analysis.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
-
-        with col2:
-            st.subheader("Export Cash Flows")
-
-            csv_cf = df_cf.to_csv(index=False)
-            st.download_button(
-                label="📥 Download Cash Flow Schedule",
-                data=csv_cf,
-                file_name=f"{inputs['project_name']}_cashflows.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
-
-        # Print-friendly summary
-        st.subheader("📄 Print-Friendly Summary")
-
-        decision_text, is_acceptable = get_decision_text(results, inputs['rate'])
-
-        summary_text = f"""
-# Capital Budgeting Analysis Report
-## Project: {inputs['project_name']}
-
-### Project Parameters
-- Initial Investment: ${inputs['initial_investment']:,.2f}
-- Discount Rate (WACC): {inputs['discount_rate']:.2f}%
-- Project Duration: {len(inputs['future_cash_flows'])} years
-
-### Key Financial Metrics
-- **Net Present Value (NPV):** ${results['npv']:,.2f}
-- **Internal Rate of Return (IRR):** {f"{results['irr'] * 100:.2f}%" if isinstance(results['irr'], float) else results['irr']}
-- **Modified IRR (MIRR):** {f"{results['mirr'] * 100:.2f}%" if isinstance(results['mirr'], float) else results['mirr']}
-- **Profitability Index (PI):** {f"{results['profitability_index']:.3f}" if isinstance(results['profitability_index'], float) else results['profitability_index']}
-- **Payback Period:** {f"{results['payback_period']} years" if isinstance(results['payback_period'], float) else results['payback_period']}
-- **Discounted Payback Period:** {f"{results['discounted_payback_period']} years" if isinstance(results['discounted_payback_period'], float) else results['discounted_payback_period']}
-
-### Recommendation
-{decision_text}
-
----
-Report generated on: {pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")}
-"""
-
-        st.text_area("Copy this report:", summary_text, height=400)
-
-        st.download_button(
-            label="📥 Download Report (TXT)",
-            data=summary_text,
-            file_name=f"{inputs['project_name']}_report.txt",
-            mime="text/plain",
-            use_container_width=True
-        )
+        render_export(results, inputs)
 
 else:
     # Welcome screen
@@ -0,0 +1,102 @@
+"""
+Checks the fast IRR solver against npf.irr.
+
+Run with: python -m pytest test_capital_budgeting_logic.py
+"""
+
+import numpy as np
+import numpy_financial as npf
+import pytest
+
+from capital_budgeting_logic import calculate_all_metrics, perform_sensitivity_analysis, _irr_fallback
+
+# Worked example from the README
+README_INVESTMENT = 100000
+README_CASH_FLOWS = np.array([25000, 30000, 35000, 40000, 45000], dtype=np.float64)
+
+
+def test_irr_matches_npf_on_conventional_cash_flows():
+    rng = np.random.default_rng(0)
+    for _ in range(500):
+        initial_investment = rng.uniform(1_000, 200_000)
+        future_cash_flows = rng.uniform(0, 0.5, rng.integers(1, 40)) * initial_investment
+        irr_value = calculate_all_metrics(0.1, initial_investment, future_cash_flows, metrics={'irr'})['irr']
+        expected = npf.irr(np.concatenate([[-initial_investment], future_cash_flows]))
+        assert abs(irr_value - expected) < 1e-8
+
+
+def test_irr_stays_not_available_without_a_solution():
+    no_root = calculate_all_metrics(0.1, 100, np.array([50.0, -60.0] * 100), metrics={'irr'})['irr']
+    with_nan = calculate_all_metrics(0.1, 100000, np.array([25000, 30000, np.nan, 40000, 45000]), metrics={'irr'})['irr']
+    assert isinstance(no_root, str) and no_root.startswith("N/A")
+    assert isinstance(with_nan, str) and with_nan.startswith("N/A")
+
+
+def test_irr_with_pyxirr_keeps_npf_root_choice():
+    pytest.importorskip("pyxirr")
+    rng = np.random.default_rng(1)
+    for _ in range(500):
+        cash_flows = rng.normal(20_000, 50_000, rng.integers(3, 15))
+        if cash_flows[0] >= 0 or np.count_nonzero(np.diff(np.sign(cash_flows))) < 2:
+            continue
+        irr_value = calculate_all_metrics(0.1, -cash_flows[0], cash_flows[1:], metrics={'irr'})['irr']
+        expected = npf.irr(cash_flows)
+        if np.isnan(expected):
+            assert isinstance(irr_value, str)
+        else:
+            assert abs(irr_value - expected) < 1e-8
+
+    # With a unique root the pyxirr fallback itself agrees with npf.irr
+    cash_flows = np.array([-100000.0, 25000, 30000, 35000, 40000, 45000])
+    assert abs(_irr_fallback(cash_flows) - npf.irr(cash_flows)) < 1e-8
+
+
+def test_npv_discounts_year_one_as_in_readme():
+    npv = calculate_all_metrics(0.1, README_INVESTMENT, README_CASH_FLOWS)['npv']
+    assert abs(npv - 29078.68) < 0.01
+
+    sensitivity = perform_sensitivity_analysis(README_INVESTMENT, README_CASH_FLOWS, 0.1)
+    assert sensitivity['cash_flows']['base'] == npv
+    assert sensitivity['discount_rate']['base'] == npv
+
+
+def test_mirr_matches_npf_mirr():
+    rng = np.random.default_rng(2)
+    for _ in range(500):
+        initial_investment = rng.uniform(1_000, 200_000)
+        future_cash_flows = rng.normal(0.2, 0.3, rng.integers(1, 30)) * initial_investment
+        finance_rate, reinvestment_rate = rng.uniform(0, 0.3, 2)
+        mirr_value = calculate_all_metrics(
+            0.1, initial_investment, future_cash_flows,
+            reinvestment_rate=reinvestment_rate, finance_rate=finance_rate, metrics={'mirr'}
+        )['mirr']
+        expected = npf.mirr(np.concatenate([[-initial_investment], future_cash_flows]), finance_rate, reinvestment_rate)
+        if np.isnan(expected):
+            assert isinstance(mirr_value, str)
+        else:
+            assert abs(mirr_value - expected) < 1e-9
+
+
+def test_mirr_is_not_available_with_nan_cash_flow():
+    mirr_value = calculate_all_metrics(0.1, 100, np.array([50, np.nan, 80]), metrics={'mirr'})['mirr']
+    assert isinstance(mirr_value, str) and mirr_value.startswith("N/A")
+
+
+def test_payback_periods():
+    readme = calculate_all_metrics(0.1, README_INVESTMENT, README_CASH_FLOWS)
+    assert readme['payback_period'] == 3.25
+    assert readme['discounted_payback_period'] == 3.96
+
+    # Recovered in year 2; the later negative flow must not move the answer
+    dip_after_recovery = calculate_all_metrics(0.1, 100, np.array([60.0, 60, -50, 80]))
+    assert dip_after_recovery['payback_period'] == 1.67
+    assert dip_after_recovery['discounted_payback_period'] == 1.92
+
+    # Cumulative total dips before recovering, so it is not sorted
+    dip_before_recovery = calculate_all_metrics(0.1, 100, np.array([60.0, -20, 70]))
+    assert dip_before_recovery['payback_period'] == 2.86
+    assert dip_before_recovery['discounted_payback_period'] == "Never"
+
+    never = calculate_all_metrics(0.1, 100, np.array([10.0, 10, 10]))
+    assert never['payback_period'] == "Never"
+    assert never['discounted_payback_period'] == "Never"